@@ -1,39 +1,121 @@
 # peg_game.py
+import multiprocessing  # Best result shared between solver processes
 import time  # For timing and display delays
+from concurrent.futures import ProcessPoolExecutor, as_completed  # Search root moves on separate cores
+from functools import lru_cache  # Move tables depend only on num_rows
 
 class Move:
-    def __init__(self, start, jumped, destination):
+    __slots__ = ('start', 'jumped', 'destination', 'mask')
+
+    def __init__(self, start, jumped, destination, mask=None):
         self.start = start
         self.jumped = jumped
         self.destination = destination
+        if mask is None:
+            mask = (1 << start) | (1 << jumped) | (1 << destination)
+        self.mask = mask
+
+@lru_cache(maxsize=None)
+def build_move_table(num_rows):
+    """Return (groups, move_tuples, move_masks) describing every jump a num_rows triangle allows.
+
+    move_tuples lists each jump as (start, jumped, destination) and move_masks the XOR
+    that applies it; moves are referred to by their index in both. groups holds
+    (dest_mask, jumps) best-first, where jumps has a (pegs_mask, index) pair for every
+    jump landing in that hole, so a filled destination rules them all out with one test.
+    """
+    def index(row, col):
+        if row < 0 or row >= num_rows or col < 0 or col > row:
+            return -1
+        return row * (row + 1) // 2 + col
+
+    jumps_into = {}
+    move_tuples = []
+    move_masks = []
+    neighbour_count = {}
+    directions = [(-2, -2), (-2, 0), (0, -2), (0, 2), (2, 0), (2, 2)]
+    for row in range(num_rows):
+        for col in range(row + 1):
+            start = index(row, col)
+            neighbour_count[start] = sum(1 for dr, dc in directions
+                                         if index(row + dr // 2, col + dc // 2) != -1)
+            for dr, dc in directions:
+                jumped = index(row + dr // 2, col + dc // 2)
+                dest = index(row + dr, col + dc)
+                if jumped != -1 and dest != -1:
+                    pegs_mask = (1 << start) | (1 << jumped)
+                    jumps_into.setdefault(dest, []).append((pegs_mask, len(move_tuples)))
+                    move_tuples.append((start, jumped, dest))
+                    move_masks.append(pegs_mask | (1 << dest))
+    # Try jumps into corners and edges first: a peg with few neighbours is hard to clear later
+    order = sorted(jumps_into, key=lambda dest: (neighbour_count[dest], dest))
+    groups = tuple((1 << dest, tuple(jumps_into[dest])) for dest in order)
+    return groups, tuple(move_tuples), tuple(move_masks)
+
+@lru_cache(maxsize=None)
+def build_symmetry_tables(num_rows):
+    """Return byte lookup tables mapping a bitboard to its five non-identity symmetric images.
+
+    A hole at (row, col) has triangular coordinates (col, row - col, num_rows - 1 - row);
+    every permutation of those three coordinates is a symmetry of the board. All five images
+    are packed side by side in one int, num_holes bits apiece, so OR-ing one entry per byte
+    of a state builds every image at once.
+    """
+    num_holes = num_rows * (num_rows + 1) // 2
+    coords = [(col, row - col, num_rows - 1 - row) for row in range(num_rows) for col in range(row + 1)]
+    index_of = {coord: i for i, coord in enumerate(coords)}
+    orders = [(1, 2, 0), (2, 0, 1), (0, 2, 1), (2, 1, 0), (1, 0, 2)]
+    perms = [[index_of[tuple(coord[k] for k in order)] for coord in coords] for order in orders]
+    tables = []
+    for chunk in range((num_holes + 7) // 8):
+        lookup = [0] * 256
+        for value in range(256):
+            for bit in range(8):
+                i = chunk * 8 + bit
+                if value >> bit & 1 and i < num_holes:
+                    for k, perm in enumerate(perms):
+                        lookup[value] |= 1 << (perm[i] + k * num_holes)
+        tables.append(lookup)
+    return tables
 
-    def is_valid(self, board):
-        """Check if the move is valid based on board state and indices."""
-        return (0 <= self.start < len(board.state) and
-                0 <= self.jumped < len(board.state) and
-                0 <= self.destination < len(board.state) and
-                board.state[self.start] and
-                board.state[self.jumped] and
-                not board.state[self.destination])
+@lru_cache(maxsize=None)
+def build_colour_masks(num_rows):
+    """Return a bitmask of the holes of each colour, colouring each hole (row + col) % 3.
+
+    Any three holes in a line get three different colours, which Board.min_pegs_possible
+    relies on.
+    """
+    return tuple(sum(1 << (row * (row + 1) // 2 + col)
+                     for row in range(num_rows) for col in range(row + 1)
+                     if (row + col) % 3 == colour)
+                 for colour in range(3))
+
+@lru_cache(maxsize=None)
+def build_coordinate_tables(num_rows):
+    """Return (row_of, col_of) tuples giving the row and column of each hole index."""
+    row_of = tuple(row for row in range(num_rows) for _ in range(row + 1))
+    col_of = tuple(col for row in range(num_rows) for col in range(row + 1))
+    return row_of, col_of
 
 class Board:
+    __slots__ = ('num_rows', 'num_holes', 'state', '_moves', '_move_tuples', '_move_masks',
+                 '_symmetries', '_colour_masks', '_row_of', '_col_of')
+
     def __init__(self, num_rows, empty_hole=0):
         """Initialize a triangular board with num_rows rows."""
         self.num_rows = num_rows
         self.num_holes = num_rows * (num_rows + 1) // 2
-        self.state = [True] * self.num_holes
-        self.state[empty_hole] = False
+        self.state = ((1 << self.num_holes) - 1) & ~(1 << empty_hole)
+        self._row_of, self._col_of = build_coordinate_tables(num_rows)
+        self._moves, self._move_tuples, self._move_masks = build_move_table(num_rows)
+        self._symmetries = build_symmetry_tables(num_rows)
+        self._colour_masks = build_colour_masks(num_rows)
 
     def get_row_col(self, index):
         """Convert hole index to (row, col) coordinates."""
         if index < 0 or index >= self.num_holes:
             return None
-        row = 0
-        while index >= (row + 1) * (row + 2) // 2:
-            row += 1
-        start_of_row = row * (row + 1) // 2
-        col = index - start_of_row
-        return row, col
+        return self._row_of[index], self._col_of[index]
 
     def get_index(self, row, col):
         """Convert (row, col) to hole index."""
@@ -41,44 +123,69 @@ class Board:
             return -1
         return row * (row + 1) // 2 + col
 
-    def get_valid_moves(self):
-        """Compute valid moves based on triangular grid geometry."""
-        moves = []
-        directions = [(-2, -2), (-2, 0), (0, -2), (0, 2), (2, 0), (2, 2)]
-        for start in range(self.num_holes):
-            if not self.state[start]:
+    def get_valid_moves(self, state=None):
+        """Yield the indices of moves whose start and jumped holes are pegged and destination is empty."""
+        if state is None:
+            state = self.state
+        for dest_mask, jumps in self._moves:
+            if state & dest_mask:
                 continue
-            start_row, start_col = self.get_row_col(start)
-            for dr, dc in directions:
-                jumped_row = start_row + dr // 2
-                jumped_col = start_col + dc // 2
-                jumped = self.get_index(jumped_row, jumped_col)
-                dest_row = start_row + dr
-                dest_col = start_col + dc
-                dest = self.get_index(dest_row, dest_col)
-                if jumped != -1 and dest != -1 and self.state[jumped] and not self.state[dest]:
-                    moves.append(Move(start, jumped, dest))
-        return moves
+            for pegs_mask, index in jumps:
+                if (state & pegs_mask) == pegs_mask:
+                    yield index
+
+    def get_move(self, index):
+        """Build the Move for a move index from get_valid_moves."""
+        return Move(*self._move_tuples[index], self._move_masks[index])
+
+    def canonical(self, state):
+        """Return the smallest of the six symmetric images of state."""
+        packed = 0
+        shift = 0
+        for lookup in self._symmetries:
+            packed |= lookup[state >> shift & 0xFF]
+            shift += 8
+        best = state
+        mask = (1 << self.num_holes) - 1
+        while packed:
+            image = packed & mask
+            if image < best:
+                best = image
+            packed >>= self.num_holes
+        return best
 
     def apply_move(self, move):
-        """Execute a move if valid and update board state."""
-        if move.is_valid(self):
-            self.state[move.start] = False
-            self.state[move.jumped] = False
-            self.state[move.destination] = True
-            return True
-        return False
-
-    def is_game_over(self):
+        """Execute a move by toggling its three holes."""
+        self.state ^= move.mask
+
+    def undo_move(self, move):
+        """Reverse a move; the toggle is its own inverse."""
+        self.state ^= move.mask
+
+    def is_game_over(self, state=None):
         """Check if no more moves are possible."""
-        return not self.get_valid_moves()
+        return next(self.get_valid_moves(state), None) is None
 
-    def pegs_remaining(self):
+    def pegs_remaining(self, state=None):
         """Count remaining pegs."""
-        return sum(1 for peg in self.state if peg)
+        if state is None:
+            state = self.state
+        return state.bit_count()
+
+    def min_pegs_possible(self):
+        """Lower bound on the pegs any sequence of moves from the current state can leave.
 
-    def display(self):
+        Every jump removes a peg from two colours and adds one to the third, so the parity
+        of each pair of colour counts never changes. A single peg makes exactly two of those
+        pair sums odd; if none is odd now, at least two pegs must remain.
+        """
+        a, b, c = ((self.state & mask).bit_count() for mask in self._colour_masks)
+        return 2 if (a + b) % 2 == 0 and (b + c) % 2 == 0 else 1
+
+    def display(self, state=None):
         """Display the board as a triangle, showing indices for pegs and . for empty holes."""
+        if state is None:
+            state = self.state
         max_index = self.num_holes - 1
         hole_width = max(4, len(str(max_index)))
         for row in range(self.num_rows):
@@ -86,63 +193,178 @@ class Board:
             start_idx = row * (row + 1) // 2
             for col in range(row + 1):
                 idx = start_idx + col
-                display_text = str(idx) if self.state[idx] else "."
+                display_text = str(idx) if state >> idx & 1 else "."
                 print(display_text.ljust(hole_width), end="")
             print()
 
 class Solver:
-    def __init__(self, board):
-        """Initialize solver with a board."""
+    def __init__(self, board, shared_best=None):
+        """Initialize solver with a board and optionally a multiprocessing.Value shared with other solvers."""
         self.board = board
+        self.shared_best = shared_best
+        # Reading through the Synchronized wrapper takes its lock every time; an int read from the
+        # raw ctypes object is atomic, so the search polls that and locks only to write
+        self._shared_raw = shared_best.get_obj() if shared_best is not None else None
         self.best_pegs = float('inf')
         self.best_moves = []
+        self._seen = set()  # Canonical boards whose subtrees have been searched
+        self._path = [0] * board.num_holes  # Move index made at each depth of the current line
 
     def solve(self, display=False, delay=1.0):
-        """Recursively find a solution minimizing remaining pegs."""
+        """Search depth-first for a solution minimizing remaining pegs."""
         self.best_pegs = float('inf')
         self.best_moves = []
-        self._solve_recursive([], display, delay)
+        self._seen = set()
+        self._target = self.board.min_pegs_possible()
+        self._search(display, delay)
+        self.best_moves = [self.board.get_move(index) for index in self.best_moves]
         return self.best_pegs, self.best_moves
 
-    def _solve_recursive(self, move_sequence, display, delay):
-        """Helper method for recursive backtracking."""
-        if self.board.is_game_over():
-            pegs_left = self.board.pegs_remaining()
-            if pegs_left < self.best_pegs:
-                self.best_pegs = pegs_left
-                self.best_moves = move_sequence[:]
-            return
-
-        moves = self.board.get_valid_moves()
-        for move in moves:
-            saved_state = self.board.state[:]
-            self.board.apply_move(move)
-            if display:
-                print(f"\nMove: {move.start} -> {move.jumped} -> {move.destination}")
-                self.board.display()
-                print(f"Pegs remaining: {self.board.pegs_remaining()}")
-                # time.sleep(delay)  # Pause to show progress
-            self._solve_recursive(move_sequence + [move], display, delay)
-            self.board.state = saved_state
-            if self.best_pegs == 1:
+    def _search(self, display, delay):
+        """Depth-first search over an explicit stack of (state, untried moves) frames.
+
+        Moves are handled as indices into the board's move table throughout, so no Move
+        objects are created until solve() translates the best line. The board itself is never
+        modified: each child is state ^ its move mask, and since ints are immutable, backing
+        up is just popping a frame.
+        """
+        board = self.board
+        move_masks = board._move_masks
+        seen = self._seen
+        path = self._path
+        target = self._target
+        shared_raw = self._shared_raw
+        stack = []
+        state = board.state
+        while True:
+            # A board reached by another move order, or a mirror image of one, has nothing new to offer.
+            # Most repeats are the exact same board, so try the raw state before paying for
+            # canonicalization; recording both keeps later repeats on the cheap path.
+            if state not in seen:
+                canonical = board.canonical(state)
+                seen_before = canonical in seen
+                seen.add(state)
+                seen.add(canonical)
+                if not seen_before:
+                    moves = tuple(board.get_valid_moves(state))
+                    if moves:
+                        stack.append((state, iter(moves)))
+                    else:
+                        self._record(state, len(stack))
+
+            while stack:
+                if self.best_pegs <= target:
+                    return
+                # Another process has already reached the minimum, so nothing here can beat it
+                if shared_raw is not None and shared_raw.value <= target:
+                    return
+                parent, moves = stack[-1]
+                move = next(moves, None)
+                if move is None:
+                    stack.pop()
+                    continue
+                path[len(stack) - 1] = move
+                state = parent ^ move_masks[move]
+                if display:
+                    move = board.get_move(move)
+                    print(f"\nMove: {move.start} -> {move.jumped} -> {move.destination}")
+                    board.display(state)
+                    print(f"Pegs remaining: {board.pegs_remaining(state)}")
+                    # time.sleep(delay)  # Pause to show progress
+                break
+            else:
                 return
 
+    def _record(self, state, depth):
+        """Keep the current line if the finished board at depth beats the best so far."""
+        pegs_left = self.board.pegs_remaining(state)
+        if pegs_left < self.best_pegs:
+            self.best_pegs = pegs_left
+            self.best_moves = self._path[:depth]
+            if self.shared_best is not None:
+                with self.shared_best.get_lock():
+                    if pegs_left < self.shared_best.value:
+                        self.shared_best.value = pegs_left
+
+_shared_best = None  # Set in each worker process by _init_worker
+
+def _init_worker(shared_best):
+    """Keep the shared best-pegs Value, which cannot be passed through submit, in a worker global."""
+    global _shared_best
+    _shared_best = shared_best
+
+def _solve_worker(num_rows, state, opening):
+    """Solve the board reached by the opening moves in a fresh process; module level so it pickles."""
+    board = Board(num_rows)
+    board.state = state
+    pegs_left, moves = Solver(board, _shared_best).solve()
+    return pegs_left, opening + moves
+
+class ParallelSolver:
+    def __init__(self, board, max_workers=None, split_depth=2):
+        """Initialize a solver that farms out the boards split_depth moves in to worker processes."""
+        self.board = board
+        self.max_workers = max_workers
+        self.split_depth = split_depth
+        self.best_pegs = float('inf')
+        self.best_moves = []
+
+    def _split(self):
+        """Expand the board split_depth moves deep, one (state, opening) per distinct canonical board."""
+        initial_state = self.board.state
+        frontier = [(initial_state, [])]
+        for _ in range(self.split_depth):
+            expanded = {}
+            for state, opening in frontier:
+                self.board.state = state
+                moves = [self.board.get_move(index) for index in self.board.get_valid_moves()]
+                if not moves:
+                    expanded.setdefault(self.board.canonical(state), (state, opening))
+                for move in moves:
+                    self.board.apply_move(move)
+                    expanded.setdefault(self.board.canonical(self.board.state),
+                                        (self.board.state, opening + [move]))
+                    self.board.undo_move(move)
+            frontier = list(expanded.values())
+        self.board.state = initial_state
+        return frontier
+
+    def solve(self):
+        """Find a solution minimizing remaining pegs, searching the split boards in parallel."""
+        self.best_pegs = float('inf')
+        self.best_moves = []
+        target = self.board.min_pegs_possible()
+        shared_best = multiprocessing.Value('i', self.board.num_holes + 1)
+        with ProcessPoolExecutor(max_workers=self.max_workers, initializer=_init_worker,
+                                 initargs=(shared_best,)) as executor:
+            futures = [executor.submit(_solve_worker, self.board.num_rows, state, opening)
+                       for state, opening in self._split()]
+            for future in as_completed(futures):
+                pegs_left, moves = future.result()
+                if pegs_left < self.best_pegs:
+                    self.best_pegs = pegs_left
+                    self.best_moves = moves
+                if self.best_pegs <= target:
+                    executor.shutdown(cancel_futures=True)
+                    break
+        return self.best_pegs, self.best_moves
+
 class Game:
     def __init__(self, num_rows=5, empty_hole=0):
         """Initialize the game with a board of num_rows rows."""
         self.board = Board(num_rows, empty_hole)
 
-    def play(self, auto_solve=False):
-        """Run the game loop, with option to auto-solve."""
+    def play(self, auto_solve=False, parallel=False):
+        """Run the game loop, with option to auto-solve (optionally across processes)."""
         if auto_solve:
-            solver = Solver(self.board)
+            solver = ParallelSolver(self.board) if parallel else Solver(self.board)
             # Time the solver (excluding display delays for accurate measurement)
             start_time = time.time()
-            pegs_left, moves = solver.solve(display=False)  # Run without display for timing
+            pegs_left, moves = solver.solve()  # Run without display for timing
             solve_time = time.time() - start_time
             # Replay moves with display for visualization
             print("Replaying solution:")
-            saved_state = self.board.state[:]  # Save initial state
+            saved_state = self.board.state  # Save initial state
             for move in moves:
                 print(f"\nMove: {move.start} -> {move.jumped} -> {move.destination}")
                 self.board.apply_move(move)
@@ -162,12 +384,12 @@ class Game:
                 print("Solution found, but more than 3 pegs remain.")
             self.board.state = saved_state  # Restore initial state
         else:
-            while not self.board.is_game_over():
-                self.board.display()
-                print(f"Pegs remaining: {self.board.pegs_remaining()}")
-                moves = self.board.get_valid_moves()
+            while True:
+                moves = [self.board.get_move(index) for index in self.board.get_valid_moves()]
                 if not moves:
                     break
+                self.board.display()
+                print(f"Pegs remaining: {self.board.pegs_remaining()}")
                 print("Valid moves (start -> jumped -> destination):")
                 for i, move in enumerate(moves, 1):
                     print(f"{i}: {move.start} -> {move.jumped} -> {move.destination}")